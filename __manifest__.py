@@ -1,17 +1,22 @@
 {
     'name': 'KAIZEN: CSR & Sustainability Tracker',
     'summary': 'Empowering Employees, Tracking Impact, Amplifying Sustainability.',
-    'version': '1.0',
+    'version': '1.1',
     'category': 'Human Resources/CSR',
     'author': 'Meriem & Maha',
     'license': 'LGPL-3',
     'depends': ['base', 'hr', 'mail'], # Inherits hr.employee, uses mail for chatter
+    'external_dependencies': {
+        'python': ['numpy'], # MinHash signatures, opportunity recommendations
+    },
     
     'data': [
         'security/ir.model.access.csv',
+        'data/sdg_data.xml', # SDG reference table, needed before any activity is created
         
         # Load model views first, in order of dependency
         'views/csr_activity_views.xml',
+        'views/csr_activity_archive_views.xml',
         'views/csr_reward_views.xml',
         'views/csr_department_views.xml',
         'views/csr_opportunity_views.xml', # <-- FIX: Added new view file
@@ -24,8 +29,10 @@
         'views/menu.xml',
         
         # Load data/demo data after all views are loaded
+        'data/ir_cron_data.xml',
         'data/reward_data.xml',
         'data/demo_data.xml',
+        'data/organization_counter_data.xml', # Recounts dashboard totals, after all activity data
     ],
     'application': True,
     'installable': True,
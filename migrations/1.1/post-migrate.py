@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    # Duplicate detection is new in 1.1: build the initial index for the
+    # activities submitted before the upgrade, which were never indexed
+    env['csr.activity']._rebuild_duplicate_index()
@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 
+from . import csr_sdg
 from . import csr_reward
 from . import csr_department
 from . import csr_organization
+from . import csr_organization_counter
 from . import csr_employee_profile # <-- MUST BE FIRST
 from . import csr_activity         # <-- MUST BE SECOND
+from . import csr_activity_lsh_band
+from . import csr_activity_summary
+from . import csr_activity_archive
 from . import csr_opportunity      
-from . import csr_utils
\ No newline at end of file
+from . import csr_opportunity_recommendation
+from . import csr_utils
+from . import csr_linkedin_share
\ No newline at end of file
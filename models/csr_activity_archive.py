@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, api, _
+from dateutil.relativedelta import relativedelta
+import threading
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Approved/rejected activities older than this many days leave the hot table.
+# Never less than a year: the last-quarter leaderboard and the current year
+# budget figures only ever read hot activities.
+ARCHIVE_HORIZON_PARAM = 'kaizen_greenflow.activity_archive_days'
+ARCHIVE_HORIZON_DEFAULT_DAYS = 730
+ARCHIVE_HORIZON_MIN_DAYS = 365
+ARCHIVE_BATCH_SIZE = 5000
+
+
+class CSRActivityArchive(models.Model):
+    """
+    Cold tier of csr.activity: closed activities past the archive horizon.
+    Records are created by the archiving job only and are read-only for everyone.
+    Their totals live on in csr.activity.summary.
+    """
+    _name = 'csr.activity.archive'
+    _description = 'Archived CSR Activity'
+    _inherit = ['mail.thread']
+    _order = 'date desc'
+
+    original_id = fields.Integer(string="Original Activity ID", readonly=True, index=True)
+    name = fields.Char(string="Activity Summary", required=True, readonly=True)
+
+    employee_profile_id = fields.Many2one('csr.employee.profile', string="Employee Profile", readonly=True, ondelete='cascade', index=True)
+    employee_id = fields.Many2one('hr.employee', string="HR Employee", readonly=True)
+    department_id = fields.Many2one(related='employee_profile_id.department_id', store=True, readonly=True)
+
+    date = fields.Date(string="Date", readonly=True, index=True)
+    hours = fields.Float(string="Hours Volunteered", readonly=True)
+    donation_amount = fields.Monetary(string="Donation Amount", currency_field='company_currency_id', readonly=True)
+    company_currency_id = fields.Many2one(related='employee_profile_id.employee_id.company_id.currency_id', string='Company Currency', readonly=True)
+
+    description = fields.Text(string="Detailed Description", readonly=True)
+    proof_document = fields.Binary(string="Proof (Image/PDF)", readonly=True)
+    proof_filename = fields.Char(string="Proof Filename", readonly=True)
+    proof_hash = fields.Char(string="Proof Checksum", readonly=True, index=True)
+
+    status = fields.Selection([
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected')
+    ], string="Status", readonly=True)
+    sdg_category = fields.Char(string="SDG Category", readonly=True)
+    carbon_offset_estimate = fields.Float(string="CO₂ Offset Estimate (kg)", readonly=True)
+    impact_points = fields.Integer(string="Impact Points Earned", readonly=True)
+
+    @api.model
+    def _get_archive_cutoff_date(self):
+        days = int(self.env['ir.config_parameter'].sudo().get_param(ARCHIVE_HORIZON_PARAM, ARCHIVE_HORIZON_DEFAULT_DAYS))
+        return fields.Date.today() - relativedelta(days=max(days, ARCHIVE_HORIZON_MIN_DAYS))
+
+    @api.model
+    def _cron_archive_activities(self, batch_size=ARCHIVE_BATCH_SIZE):
+        """
+        Moves closed activities past the archive horizon to the cold table.
+        For each batch: fold approved totals into the summary rows, copy the
+        records, re-attach their proof documents and chatter, then delete them
+        from the hot table. Metric totals are unchanged by the move.
+        Each batch is self-consistent and committed on its own, so a first run
+        over years of history neither holds every lock until the end nor
+        loses the batches already moved when a later one fails.
+        """
+        cutoff = self._get_archive_cutoff_date()
+        Activity = self.env['csr.activity'].sudo()
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        archived_count = 0
+
+        while True:
+            activities = Activity.search([
+                ('status', 'in', ('approved', 'rejected')),
+                ('date', '<', cutoff),
+            ], order='id', limit=batch_size)
+            if not activities:
+                break
+
+            self.env['csr.activity.summary'].sudo()._add_archived_activities(activities.ids)
+
+            archives = self.sudo().with_context(tracking_disable=True).create([{
+                'original_id': activity.id,
+                'name': activity.name,
+                'employee_profile_id': activity.employee_profile_id.id,
+                'employee_id': activity.employee_id.id,
+                'date': activity.date,
+                'hours': activity.hours,
+                'donation_amount': activity.donation_amount,
+                'description': activity.description,
+                'proof_filename': activity.proof_filename,
+                'proof_hash': activity.proof_hash,
+                'status': activity.status,
+                'sdg_category': activity.sdg_category,
+                'carbon_offset_estimate': activity.carbon_offset_estimate,
+                'impact_points': activity.impact_points,
+            } for activity in activities])
+
+            # Re-point proof attachments and chatter history to the archived copies
+            self.env.flush_all()
+            params = {'old_ids': activities.ids, 'new_ids': archives.ids}
+            self.env.cr.execute("""
+                UPDATE ir_attachment a SET res_model = 'csr.activity.archive', res_id = m.new_id
+                FROM unnest(%(old_ids)s::int[], %(new_ids)s::int[]) AS m(old_id, new_id)
+                WHERE a.res_model = 'csr.activity' AND a.res_id = m.old_id
+            """, params)
+            self.env.cr.execute("""
+                UPDATE mail_message msg SET model = 'csr.activity.archive', res_id = m.new_id
+                FROM unnest(%(old_ids)s::int[], %(new_ids)s::int[]) AS m(old_id, new_id)
+                WHERE msg.model = 'csr.activity' AND msg.res_id = m.old_id
+            """, params)
+            self.env.invalidate_all()
+
+            activities.unlink()
+            archived_count += len(archives)
+            if auto_commit:
+                self.env.cr.commit()
+
+        _logger.info("Archived %s CSR activities dated before %s.", archived_count, cutoff)
+        return True
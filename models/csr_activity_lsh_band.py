@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, api, _
+
+class CSRActivityLSHBand(models.Model):
+    """
+    Locality-sensitive hashing index over activity descriptions.
+    Each submitted activity owns one row per MinHash band, so finding
+    candidate duplicates is an indexed lookup instead of a full table scan.
+    """
+    _name = 'csr.activity.lsh.band'
+    _description = 'CSR Activity Duplicate Detection Index'
+    _log_access = False
+
+    activity_id = fields.Many2one('csr.activity', string="Activity", required=True, ondelete='cascade', index=True)
+    band_key = fields.Char(string="Band Key", required=True)
+
+    def init(self):
+        # Candidate lookup: most recent activities first for each band key
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS csr_activity_lsh_band_key_activity_idx
+            ON csr_activity_lsh_band (band_key, activity_id)
+        """)
+
+    @api.model
+    def _get_candidate_activity_ids(self, band_keys, exclude_id, limit_per_band):
+        """
+        Returns the ids of activities sharing a band key with band_keys,
+        reading at most limit_per_band index entries per band.
+        """
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT DISTINCT candidate.activity_id
+            FROM unnest(%s::varchar[]) AS k(band_key),
+            LATERAL (
+                SELECT activity_id FROM csr_activity_lsh_band
+                WHERE band_key = k.band_key AND activity_id != %s
+                ORDER BY activity_id DESC
+                LIMIT %s
+            ) AS candidate
+        """, (list(band_keys), exclude_id, limit_per_band))
+        return [row[0] for row in self.env.cr.fetchall()]
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, api, _
+
+# Additive totals kept for archived approved activities
+SUMMARY_TOTAL_FIELDS = ['hours', 'donation_amount', 'impact_points', 'carbon_offset_estimate']
+
+
+class CSRActivitySummary(models.Model):
+    """
+    Totals of the approved activities moved to the archive, one row per
+    employee profile and SDG. Hot activities plus these rows give exactly
+    the same totals as the full activity history.
+
+    Like csr.activity, the department is resolved through the employee
+    profile (stored related field), so an employee's archived history
+    follows them to a new department together with their hot activities.
+    """
+    _name = 'csr.activity.summary'
+    _description = 'CSR Archived Activity Summary'
+    _order = 'employee_profile_id, sdg_category'
+
+    employee_profile_id = fields.Many2one('csr.employee.profile', string="Employee Profile", required=True, ondelete='cascade', index=True)
+    department_id = fields.Many2one(related='employee_profile_id.department_id', store=True, readonly=True, index=True)
+    sdg_category = fields.Char(string="SDG Category", required=True, index=True)
+    sdg_id = fields.Many2one('csr.sdg', string="SDG", index=True)
+
+    activity_count = fields.Integer(string="Approved Activities")
+    hours = fields.Float(string="Hours Volunteered")
+    donation_amount = fields.Float(string="Donation Amount")
+    impact_points = fields.Integer(string="Impact Points")
+    carbon_offset_estimate = fields.Float(string="CO₂ Offset Estimate (kg)")
+
+    def init(self):
+        # Conflict target of the upsert done when archiving activities
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS csr_activity_summary_key_uniq
+            ON csr_activity_summary (employee_profile_id, sdg_category)
+        """)
+
+    @api.model
+    def _add_archived_activities(self, activity_ids):
+        """
+        Folds the approved activities among activity_ids into the summary rows.
+        Must run before those activities are deleted from the hot table.
+        """
+        if not activity_ids:
+            return
+        self.env.flush_all()
+        self.env.cr.execute("""
+            INSERT INTO csr_activity_summary (
+                employee_profile_id, department_id, sdg_category, sdg_id, activity_count,
+                hours, donation_amount, impact_points, carbon_offset_estimate,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT a.employee_profile_id, p.department_id, COALESCE(a.sdg_category, 'other'), max(a.sdg_id), count(*),
+                   COALESCE(sum(a.hours), 0), COALESCE(sum(a.donation_amount), 0),
+                   COALESCE(sum(a.impact_points), 0), COALESCE(sum(a.carbon_offset_estimate), 0),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+            FROM csr_activity a
+            JOIN csr_employee_profile p ON p.id = a.employee_profile_id
+            WHERE a.id = ANY(%(ids)s) AND a.status = 'approved'
+            GROUP BY a.employee_profile_id, p.department_id, COALESCE(a.sdg_category, 'other')
+            ON CONFLICT (employee_profile_id, sdg_category) DO UPDATE SET
+                department_id = EXCLUDED.department_id,
+                sdg_id = COALESCE(csr_activity_summary.sdg_id, EXCLUDED.sdg_id),
+                activity_count = csr_activity_summary.activity_count + EXCLUDED.activity_count,
+                hours = csr_activity_summary.hours + EXCLUDED.hours,
+                donation_amount = csr_activity_summary.donation_amount + EXCLUDED.donation_amount,
+                impact_points = csr_activity_summary.impact_points + EXCLUDED.impact_points,
+                carbon_offset_estimate = csr_activity_summary.carbon_offset_estimate + EXCLUDED.carbon_offset_estimate,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, {'ids': list(activity_ids), 'uid': self.env.uid})
+        self.invalidate_model()
+
+    @api.model
+    def _get_approved_totals(self, groupby=None, domain=None):
+        """
+        Sums the approved hot activities and the archived summary rows.
+        `groupby` and `domain` may use employee_profile_id, department_id,
+        sdg_id or sdg_category, which both tiers share (sdg_id is indexed).
+        Returns {group_key: {'activity_count': ..., 'hours': ..., ...}}
+        (the key is False when no groupby is given).
+        """
+        domain = list(domain or [])
+        sum_fields = [f"{fname}:sum" for fname in SUMMARY_TOTAL_FIELDS]
+        sources = [
+            (self.env['csr.activity'], [('status', '=', 'approved')] + domain, sum_fields, '__count'),
+            (self, domain, sum_fields + ['activity_count:sum'], 'activity_count'),
+        ]
+
+        totals = {}
+        for model, model_domain, model_fields, count_field in sources:
+            groups = model.read_group(
+                domain=model_domain,
+                fields=model_fields,
+                groupby=[groupby] if groupby else [],
+                lazy=False
+            )
+            for group in groups:
+                key = group[groupby] if groupby else False
+                if isinstance(key, tuple):
+                    key = key[0]
+                total = totals.setdefault(key, dict.fromkeys(['activity_count'] + SUMMARY_TOTAL_FIELDS, 0))
+                total['activity_count'] += group.get(count_field) or 0
+                for fname in SUMMARY_TOTAL_FIELDS:
+                    total[fname] += group.get(fname) or 0
+        return totals
@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
 from odoo import fields, models, api, _
 from odoo.exceptions import ValidationError  
+from datetime import date, timedelta
+import logging
+import numpy as np
+
+_logger = logging.getLogger(__name__)
+
+# Simulated share of the carbon offset counted as carbon used
+CARBON_USAGE_RATIO = 0.5
 
 class CSRDepartment(models.Model):
     _name = 'csr.department'
@@ -22,39 +30,46 @@ class CSRDepartment(models.Model):
     )
     
     carbon_used = fields.Float(
-        string="Simulated Carbon Used (kg)",  
+        string="Simulated Carbon Used, All Time (kg)",  
         compute='_compute_carbon_metrics',  
         store=True,  
         help="Simulated metric for carbon usage (e.g., 50% of offset is used as a placeholder for actual usage)."
     )
     
     budget_usage_percentage = fields.Float(
-        string="Budget Usage (%)",  
+        string="Budget Usage, All Time (%)",  
         compute='_compute_carbon_metrics',  
         store=True
     )
 
+    # Forecast fields (written by the nightly forecast job). They only cover the
+    # current calendar year, unlike the all-time figures above.
+    year_to_date_usage = fields.Float(
+        string="Carbon Used This Year (kg)",
+        readonly=True,
+        help="Simulated carbon used by approved activities since January 1st."
+    )
+    year_to_date_usage_percentage = fields.Float(string="Budget Usage This Year (%)", readonly=True)
+    projected_year_end_usage = fields.Float(
+        string="Projected Usage This Year (kg)",
+        readonly=True,
+        help="Carbon used this year so far plus the linear trend of daily usage projected to December 31st."
+    )
+    projected_usage_percentage = fields.Float(string="Projected Budget Usage This Year (%)", readonly=True)
+    expected_breach_date = fields.Date(
+        string="Expected Budget Breach",
+        readonly=True,
+        help="Date at which this year's usage is expected to exceed the carbon budget (empty if no breach is expected)."
+    )
+    forecast_date = fields.Date(string="Forecast Computed On", readonly=True)
+
     @api.depends('carbon_budget')
     def _compute_carbon_metrics(self):
-        
-        # --- THIS IS THE FIX ---
-        # 1. Switched from internal '_read_group' to public 'read_group'.
-        # 2. Changed 'aggregates' to 'fields' and added ':sum' (the Odoo 19.0 way).
-        # 3. Added 'lazy=False' to ensure the query runs correctly.
-        #
-        # 'read_group' IS GUARANTEED to return a list of dictionaries,
-        # which makes the dictionary comprehension code below (line 59) work.
-        
-        activity_data = self.env['csr.activity'].read_group(
-            domain=[('status', '=', 'approved'), ('department_id', 'in', self.department_id.ids)],
-            fields=['carbon_offset_estimate:sum'],  # <-- FIX 2
-            groupby=['department_id'],
-            lazy=False  # <-- FIX 3
+        # Hot activities plus the summary rows of archived ones
+        totals = self.env['csr.activity.summary']._get_approved_totals(
+            'department_id', [('department_id', 'in', self.department_id.ids)]
         )
-        
-        # This line (line 59) will now work, because 'data' is a dict.
-        # data['department_id'] will be a tuple like (5, 'Sales')
-        offset_map = {data['department_id'][0]: data['carbon_offset_estimate'] for data in activity_data if data['department_id']}
+        offset_map = {department_id: data['carbon_offset_estimate'] for department_id, data in totals.items() if department_id}
 
         for dept in self:
             # Get the offset from our map, defaulting to 0.0
@@ -63,13 +78,97 @@ class CSRDepartment(models.Model):
             dept.total_carbon_offset = offset
             
             # Simulate carbon usage as 50% of the offset (as per your plan)
-            dept.carbon_used = offset * 0.5 
+            dept.carbon_used = offset * CARBON_USAGE_RATIO
             
             if dept.carbon_budget > 0:
                 dept.budget_usage_percentage = (dept.carbon_used / dept.carbon_budget) * 100
             else:
                 dept.budget_usage_percentage = 0.0
 
+    @api.model
+    def _cron_compute_budget_forecast(self):
+        """
+        Nightly job: builds the daily usage series of every department for the
+        current year from one grouped query, fits a linear trend to all of them
+        at once and stores the projected year-end usage and breach date.
+        """
+        today = fields.Date.context_today(self)
+        year_start = date(today.year, 1, 1)
+        days_elapsed = (today - year_start).days + 1
+        days_in_year = (date(today.year, 12, 31) - year_start).days + 1
+
+        departments = self.search_read([], ['department_id', 'carbon_budget'])
+        if not departments:
+            return True
+        row_index = {dept['department_id'][0]: i for i, dept in enumerate(departments)}
+        budgets = np.array([dept['carbon_budget'] for dept in departments], dtype=np.float64)
+
+        # 1. Daily usage matrix: one row per department, one column per elapsed day
+        usage = np.zeros((len(departments), days_elapsed), dtype=np.float64)
+        daily_offsets = self.env['csr.activity']._read_group(
+            domain=[
+                ('status', '=', 'approved'),
+                ('department_id', 'in', list(row_index)),
+                ('date', '>=', year_start),
+                ('date', '<=', today),
+            ],
+            groupby=['department_id', 'date:day'],
+            aggregates=['carbon_offset_estimate:sum'],
+        )
+        for department, day, offset in daily_offsets:
+            usage[row_index[department.id], (day - year_start).days] = (offset or 0.0) * CARBON_USAGE_RATIO
+
+        # 2. Least-squares linear trend of daily usage, for all departments at once
+        t = np.arange(days_elapsed, dtype=np.float64)
+        t_centered = t - t.mean()
+        denominator = (t_centered ** 2).sum()
+        mean_usage = usage.mean(axis=1)
+        slope = (usage - mean_usage[:, None]) @ t_centered / denominator if denominator else np.zeros(len(departments))
+        intercept = mean_usage - slope * t.mean()
+
+        # 3. Project the remaining days (no negative usage) and accumulate
+        future_t = np.arange(days_elapsed, days_in_year, dtype=np.float64)
+        projected = np.clip(intercept[:, None] + slope[:, None] * future_t[None, :], 0.0, None)
+        cumulative = np.cumsum(np.concatenate([usage, projected], axis=1), axis=1)
+        year_to_date_usage = cumulative[:, days_elapsed - 1]
+        year_end_usage = cumulative[:, -1]
+
+        # 4. First day the cumulative usage reaches the budget
+        breached = (cumulative >= budgets[:, None]) & (budgets[:, None] > 0)
+        has_breach = breached.any(axis=1)
+        breach_day = breached.argmax(axis=1)
+        year_to_date_percentage = np.divide(year_to_date_usage * 100, budgets, out=np.zeros_like(year_to_date_usage), where=budgets > 0)
+        usage_percentage = np.divide(year_end_usage * 100, budgets, out=np.zeros_like(year_end_usage), where=budgets > 0)
+
+        # 5. Store everything in one statement
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE csr_department d
+            SET year_to_date_usage = v.year_to_date_usage,
+                year_to_date_usage_percentage = v.year_to_date_percentage,
+                projected_year_end_usage = v.year_end_usage,
+                projected_usage_percentage = v.usage_percentage,
+                expected_breach_date = v.breach_date,
+                forecast_date = %s
+            FROM unnest(%s::int[], %s::float8[], %s::float8[], %s::float8[], %s::float8[], %s::date[])
+                AS v(id, year_to_date_usage, year_to_date_percentage, year_end_usage, usage_percentage, breach_date)
+            WHERE d.id = v.id
+        """, (
+            today,
+            [dept['id'] for dept in departments],
+            year_to_date_usage.tolist(),
+            year_to_date_percentage.tolist(),
+            year_end_usage.tolist(),
+            usage_percentage.tolist(),
+            [year_start + timedelta(days=int(day)) if breach else None for day, breach in zip(breach_day, has_breach)],
+        ))
+        self.invalidate_model([
+            'year_to_date_usage', 'year_to_date_usage_percentage', 'projected_year_end_usage',
+            'projected_usage_percentage', 'expected_breach_date', 'forecast_date',
+        ])
+        _logger.info("Computed carbon budget forecasts for %s departments.", len(departments))
+        return True
+
     @api.constrains('department_id')
     def _check_department_id_unique(self):
         for record in self:
@@ -25,6 +25,9 @@ class CSREmployeeProfile(models.Model):
     company_currency_id = fields.Many2one(related='employee_id.company_id.currency_id', string='Company Currency', readonly=True)
     
     activity_ids = fields.One2many('csr.activity', 'employee_profile_id', string="CSR Activities")
+    archived_activity_ids = fields.One2many('csr.activity.archive', 'employee_profile_id', string="Archived Activities", readonly=True)
+    linkedin_share_ids = fields.One2many('csr.linkedin.share', 'employee_profile_id', string="LinkedIn Shares", readonly=True)
+    recommendation_ids = fields.One2many('csr.opportunity.recommendation', 'employee_profile_id', string="Recommended Opportunities", readonly=True)
     
     rank_display = fields.Char(string="Current Rank (Total Points)", compute='_compute_rank', store=False)
     improvement_rank_display = fields.Char(string="Rank (Improvement)", compute='_compute_rank', store=False)
@@ -34,12 +37,17 @@ class CSREmployeeProfile(models.Model):
     
     @api.depends('activity_ids.status', 'activity_ids.impact_points', 'activity_ids.hours', 'activity_ids.donation_amount')
     def _compute_csr_metrics(self):
+        # Hot activities plus the summary rows of archived ones
+        totals = self.env['csr.activity.summary']._get_approved_totals(
+            'employee_profile_id', [('employee_profile_id', 'in', self.ids)]
+        )
         for employee_profile in self:
-            approved_activities = employee_profile.activity_ids.filtered(lambda r: r.status == 'approved')
-            employee_profile.volunteering_hours = sum(approved_activities.mapped('hours'))
-            employee_profile.donation_amount = sum(approved_activities.mapped('donation_amount'))
-            employee_profile.total_impact_points = sum(approved_activities.mapped('impact_points'))
+            profile_totals = totals.get(employee_profile.id, {})
+            employee_profile.volunteering_hours = profile_totals.get('hours', 0.0)
+            employee_profile.donation_amount = profile_totals.get('donation_amount', 0.0)
+            employee_profile.total_impact_points = profile_totals.get('impact_points', 0)
 
+    # The 90-180 day window is always within the hot tier (archive horizon >= 1 year)
     @api.depends('activity_ids.date', 'activity_ids.impact_points', 'activity_ids.status')
     def _compute_last_quarter_points(self):
         today = fields.Date.today()
@@ -101,21 +109,40 @@ class CSREmployeeProfile(models.Model):
             }
         }
         
-    # --- MODIFIED: This function now calls the central utility file ---
+    def action_view_recommendations(self):
+        """
+        Opens the opportunities precomputed for this employee by the nightly
+        recommendation job, best match first.
+        """
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Recommended Opportunities'),
+            'res_model': 'csr.opportunity.recommendation',
+            'view_mode': 'list',
+            'domain': [('employee_profile_id', '=', self.id)],
+        }
+
+    # --- MODIFIED: Shares are queued in the outbox and posted by a cron ---
     def action_share_on_linkedin(self):
         self.ensure_one()
         
-        # 1. Call the central utility function to get the simulated message
+        # 1. Build the message and queue it; the outbox cron posts it in the background
         message = self.env['csr.utils'].simulate_linkedin_share(self)
+        share = self.env['csr.linkedin.share'].sudo().create({
+            'employee_profile_id': self.id,
+            'message': message,
+        })
+        share._trigger_send()
         
-        # 2. Return the success notification
+        # 2. Return immediately with a notification
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
-                'title': _('LinkedIn Share (Simulated)'),
-                'message': _("Successfully posted to LinkedIn: '%s'") % message,
-                'sticky': True, 
+                'title': _('LinkedIn Share Queued'),
+                'message': _("Your post will be published on LinkedIn shortly: '%s'") % message,
+                'sticky': False, 
                 'type': 'success',
             }
         }
\ No newline at end of file
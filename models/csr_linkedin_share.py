@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, api, _
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from .csr_utils import TokenBucket
+import threading
+import requests
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# --- Outbox Configuration (system parameters, with defaults) ---
+SHARE_RATE_PARAM = 'kaizen_greenflow.linkedin_rate_per_second'
+SHARE_RATE_DEFAULT = 2.0
+SHARE_BATCH_PARAM = 'kaizen_greenflow.linkedin_batch_size'
+SHARE_BATCH_DEFAULT = 200
+SHARE_MAX_ATTEMPTS = 5
+SHARE_RETRY_BASE_DELAY = 60  # seconds, doubled on every attempt
+
+
+class CSRLinkedInShare(models.Model):
+    """
+    Outbox of LinkedIn shares. The dashboard button only queues a share;
+    the 'Send LinkedIn Shares' cron posts them at a limited rate, with
+    retries and a per-share status.
+    """
+    _name = 'csr.linkedin.share'
+    _description = 'CSR LinkedIn Share'
+    _order = 'id desc'
+
+    employee_profile_id = fields.Many2one('csr.employee.profile', string="Employee Profile", required=True, ondelete='cascade', index=True)
+    message = fields.Text(string="Message", required=True, readonly=True)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed')
+    ], string="Status", default='queued', required=True, readonly=True, index=True)
+    attempt_count = fields.Integer(string="Attempts", default=0, readonly=True)
+    next_attempt_date = fields.Datetime(string="Next Attempt", readonly=True)
+    sent_date = fields.Datetime(string="Sent On", readonly=True)
+    linkedin_post_id = fields.Char(string="LinkedIn Post ID", readonly=True)
+    last_error = fields.Text(string="Last Error", readonly=True)
+
+    def init(self):
+        # The drain query only ever looks at queued shares
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS csr_linkedin_share_queued_idx
+            ON csr_linkedin_share (next_attempt_date, id) WHERE state = 'queued'
+        """)
+
+    @api.model
+    def _trigger_send(self, at=None):
+        self.env.ref('kaizen_greenflow.ir_cron_send_linkedin_shares').sudo()._trigger(at)
+
+    @api.model
+    def _parse_retry_after(self, value):
+        """
+        Returns the delay in seconds of a Retry-After header, given either as
+        a number of seconds or as an HTTP-date (RFC 9110). Falls back to
+        SHARE_RETRY_BASE_DELAY when the header is missing or invalid.
+        """
+        value = (value or "").strip()
+        if value.isdigit():
+            return max(int(value), 1)
+        try:
+            retry_date = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return SHARE_RETRY_BASE_DELAY
+        if retry_date.tzinfo is None:
+            retry_date = retry_date.replace(tzinfo=timezone.utc)
+        return max(int((retry_date - datetime.now(timezone.utc)).total_seconds()), 1)
+
+    def _schedule_retry(self, error, retry_after=None):
+        """
+        Puts the share back in the queue with an exponential backoff, or marks
+        it failed once SHARE_MAX_ATTEMPTS is reached.
+        """
+        self.ensure_one()
+        attempts = self.attempt_count + 1
+        if attempts >= SHARE_MAX_ATTEMPTS:
+            self.write({'state': 'failed', 'attempt_count': attempts, 'last_error': error})
+            return
+        delay = retry_after or SHARE_RETRY_BASE_DELAY * (2 ** (attempts - 1))
+        self.write({
+            'attempt_count': attempts,
+            'next_attempt_date': fields.Datetime.now() + timedelta(seconds=delay),
+            'last_error': error,
+        })
+
+    def _send(self):
+        """
+        Posts one share. Returns the Retry-After delay (seconds) when LinkedIn
+        rate-limited the call, so the caller can pause the whole queue.
+        """
+        self.ensure_one()
+        try:
+            # A savepoint keeps the transaction usable to record the failure
+            with self.env.cr.savepoint():
+                post_id = self.env['csr.utils'].post_linkedin_share(self.message)
+        except requests.HTTPError as error:
+            response = error.response
+            status = response.status_code if response is not None else None
+            if status == 429:
+                retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+                # Rate limiting is not the share's fault: do not count the attempt
+                self.write({'next_attempt_date': fields.Datetime.now() + timedelta(seconds=retry_after), 'last_error': str(error)})
+                return retry_after
+            if status and 400 <= status < 500:
+                # Rejected request (bad token, invalid payload...): retrying will not help
+                self.write({'state': 'failed', 'attempt_count': self.attempt_count + 1, 'last_error': str(error)})
+            else:
+                self._schedule_retry(str(error))
+        except requests.RequestException as error:
+            self._schedule_retry(str(error))
+        except Exception as error:
+            # Anything else (e.g. an unreadable response) must not abort the
+            # cron before the share is updated, or it would block the queue
+            _logger.exception("Unexpected error while posting LinkedIn share %s", self.id)
+            self._schedule_retry(str(error) or error.__class__.__name__)
+        else:
+            self.write({
+                'state': 'sent',
+                'attempt_count': self.attempt_count + 1,
+                'sent_date': fields.Datetime.now(),
+                'linkedin_post_id': post_id,
+                'last_error': False,
+            })
+        return None
+
+    @api.model
+    def _cron_send_queued_shares(self):
+        """
+        Drains the outbox: sends due shares in id order through a token bucket
+        rate limiter, committing after each call so a crash never re-sends a
+        posted share. Re-triggers itself while due shares remain.
+        Shares are only ever sent from this cron, and ir.cron never runs a job
+        twice at the same time, so two workers cannot send the same share.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        rate = float(ICP.get_param(SHARE_RATE_PARAM, SHARE_RATE_DEFAULT))
+        batch_size = int(ICP.get_param(SHARE_BATCH_PARAM, SHARE_BATCH_DEFAULT))
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+
+        self.flush_model(['state', 'next_attempt_date'])
+        self.env.cr.execute("""
+            SELECT id FROM csr_linkedin_share
+            WHERE state = 'queued' AND (next_attempt_date IS NULL OR next_attempt_date <= now() at time zone 'UTC')
+            ORDER BY id
+            LIMIT %s
+        """, (batch_size,))
+        shares = self.browse([row[0] for row in self.env.cr.fetchall()])
+
+        bucket = TokenBucket(rate, capacity=rate)
+        for share in shares:
+            bucket.consume()
+            retry_after = share._send()
+            if auto_commit:
+                self.env.cr.commit()
+            if retry_after:
+                _logger.warning("LinkedIn rate limit hit, pausing the share queue for %s seconds.", retry_after)
+                self._trigger_send(fields.Datetime.now() + timedelta(seconds=retry_after))
+                return True
+
+        if len(shares) == batch_size:
+            self._trigger_send()
+        return True
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, api, _
+import zlib
+import logging
+import numpy as np
+from .csr_sdg import SDG_CODES
+
+_logger = logging.getLogger(__name__)
+
+# --- Recommendation Engine Configuration ---
+RECOMMENDATION_TOP_K = 10
+# Keywords are hashed into a fixed number of buckets so affinity vectors
+# have a constant width whatever the vocabulary size.
+RECOMMENDATION_KEYWORD_BUCKETS = 256
+RECOMMENDATION_SDG_WEIGHT = 0.6
+RECOMMENDATION_KEYWORD_WEIGHT = 0.4
+# Weight of the organization's lacking SDGs in every profile (cold start + strategic nudge)
+RECOMMENDATION_LACKING_SDG_PRIOR = 0.25
+RECOMMENDATION_PROFILE_BATCH_SIZE = 128
+RECOMMENDATION_ACTIVITY_BATCH_SIZE = 10000
+
+SDG_INDEX = {code: i for i, code in enumerate(SDG_CODES)}
+
+
+class CSROpportunityRecommendation(models.Model):
+    """
+    Precomputed top-K opportunities per employee profile.
+    Rebuilt nightly by _cron_compute_recommendations; the dashboard only reads it.
+    """
+    _name = 'csr.opportunity.recommendation'
+    _description = 'CSR Opportunity Recommendation'
+    _order = 'employee_profile_id, rank'
+    _log_access = False
+
+    employee_profile_id = fields.Many2one('csr.employee.profile', string="Employee Profile", required=True, ondelete='cascade', index=True)
+    opportunity_id = fields.Many2one('csr.opportunity', string="Opportunity", required=True, ondelete='cascade')
+    rank = fields.Integer(string="Rank")
+    score = fields.Float(string="Affinity Score", digits=(16, 4))
+
+    ngo = fields.Char(related='opportunity_id.ngo', readonly=True)
+    date = fields.Date(related='opportunity_id.date', readonly=True)
+    location_name = fields.Char(related='opportunity_id.location_name', readonly=True)
+    linked_sdg = fields.Selection(related='opportunity_id.linked_sdg', readonly=True)
+
+    @api.model
+    def _get_keyword_buckets(self, text):
+        utils = self.env['csr.utils']
+        return [zlib.crc32(word.encode('utf-8')) % RECOMMENDATION_KEYWORD_BUCKETS for word in utils.get_description_keywords(text)]
+
+    @api.model
+    def _normalize_rows(self, matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @api.model
+    def _get_lacking_sdg_prior(self):
+        """Unit vector over the organization's three lacking SDGs."""
+        prior = np.zeros(len(SDG_CODES), dtype=np.float32)
+        org = self.env['csr.organization'].search([], limit=1)
+        for code in (org._get_lacking_sdg_codes() if org else []):
+            if code in SDG_INDEX:
+                prior[SDG_INDEX[code]] = 1.0
+        norm = np.linalg.norm(prior)
+        return prior / norm if norm else prior
+
+    @api.model
+    def _build_profile_vectors(self, profile_ids):
+        """
+        Builds the SDG and keyword affinity matrices of the profiles from their
+        approved activities (hot and archived), weighting each activity by its hours.
+        """
+        row_index = {profile_id: i for i, profile_id in enumerate(profile_ids)}
+        sdg_matrix = np.zeros((len(profile_ids), len(SDG_CODES)), dtype=np.float32)
+        keyword_matrix = np.zeros((len(profile_ids), RECOMMENDATION_KEYWORD_BUCKETS), dtype=np.float32)
+
+        # Archived activities keep their name and description, so they count
+        # exactly like hot ones
+        for model in (self.env['csr.activity'], self.env['csr.activity.archive']):
+            last_id = 0
+            while True:
+                activities = model.search_read(
+                    [('status', '=', 'approved'), ('id', '>', last_id)],
+                    ['employee_profile_id', 'sdg_category', 'hours', 'name', 'description'],
+                    order='id', limit=RECOMMENDATION_ACTIVITY_BATCH_SIZE,
+                )
+                if not activities:
+                    break
+                for activity in activities:
+                    row = row_index.get(activity['employee_profile_id'] and activity['employee_profile_id'][0])
+                    if row is None:
+                        continue
+                    weight = 1.0 + (activity['hours'] or 0.0)
+                    sdg_matrix[row, SDG_INDEX.get(activity['sdg_category'] or 'other', SDG_INDEX['other'])] += weight
+                    for bucket in self._get_keyword_buckets(f"{activity['name']} {activity['description'] or ''}"):
+                        keyword_matrix[row, bucket] += weight
+                last_id = activities[-1]['id']
+
+        sdg_matrix = self._normalize_rows(sdg_matrix) + RECOMMENDATION_LACKING_SDG_PRIOR * self._get_lacking_sdg_prior()
+        return self._normalize_rows(sdg_matrix), self._normalize_rows(keyword_matrix)
+
+    @api.model
+    def _build_opportunity_vectors(self, opportunities):
+        sdg_matrix = np.zeros((len(opportunities), len(SDG_CODES)), dtype=np.float32)
+        keyword_matrix = np.zeros((len(opportunities), RECOMMENDATION_KEYWORD_BUCKETS), dtype=np.float32)
+        for row, opportunity in enumerate(opportunities):
+            sdg_matrix[row, SDG_INDEX.get(opportunity['linked_sdg'] or 'other', SDG_INDEX['other'])] = 1.0
+            for bucket in self._get_keyword_buckets(f"{opportunity['name']} {opportunity['description'] or ''}"):
+                keyword_matrix[row, bucket] = 1.0
+        return sdg_matrix, self._normalize_rows(keyword_matrix)
+
+    @api.model
+    def _cron_compute_recommendations(self):
+        """
+        Nightly job: scores every employee profile against all upcoming
+        opportunities with matrix products and stores the top-K per profile.
+        """
+        today = fields.Date.context_today(self)
+        opportunities = self.env['csr.opportunity'].search_read(
+            ['|', ('date', '=', False), ('date', '>=', today)],
+            ['name', 'description', 'linked_sdg'],
+        )
+        profile_ids = self.env['csr.employee.profile'].search([]).ids
+
+        self.env.flush_all()
+        self.env.cr.execute("DELETE FROM csr_opportunity_recommendation")
+        self.invalidate_model()
+        self.env['csr.employee.profile'].invalidate_model(['recommendation_ids'])
+        if not opportunities or not profile_ids:
+            return True
+
+        opportunity_ids = np.array([opportunity['id'] for opportunity in opportunities])
+        opportunity_sdg, opportunity_keywords = self._build_opportunity_vectors(opportunities)
+        profile_sdg, profile_keywords = self._build_profile_vectors(profile_ids)
+        top_k = min(RECOMMENDATION_TOP_K, len(opportunities))
+
+        # Score profiles in batches to bound the size of the score matrix
+        for start in range(0, len(profile_ids), RECOMMENDATION_PROFILE_BATCH_SIZE):
+            stop = start + RECOMMENDATION_PROFILE_BATCH_SIZE
+            scores = (
+                RECOMMENDATION_SDG_WEIGHT * (profile_sdg[start:stop] @ opportunity_sdg.T)
+                + RECOMMENDATION_KEYWORD_WEIGHT * (profile_keywords[start:stop] @ opportunity_keywords.T)
+            )
+            top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            batch_profile_ids = np.repeat(profile_ids[start:stop], top_k)
+            ranks = np.tile(np.arange(1, top_k + 1), len(top))
+            self.env.cr.execute("""
+                INSERT INTO csr_opportunity_recommendation (employee_profile_id, opportunity_id, rank, score)
+                SELECT * FROM unnest(%s::int[], %s::int[], %s::int[], %s::float8[])
+            """, (
+                batch_profile_ids.tolist(),
+                opportunity_ids[top].ravel().tolist(),
+                ranks.tolist(),
+                top_scores.ravel().astype(float).tolist(),
+            ))
+
+        self.invalidate_model()
+        self.env['csr.employee.profile'].invalidate_model(['recommendation_ids'])
+        _logger.info("Computed opportunity recommendations for %s profiles against %s opportunities.", len(profile_ids), len(opportunities))
+        return True
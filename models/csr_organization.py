@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 from odoo import fields, models, api, _
+from .csr_sdg import SDG_CODES
 import json
 
 class CSROrganization(models.Model):
     """
     This is a singleton model to hold organization-wide CSR data.
     There should only be one record of this model.
+
+    Activity totals are not stored on this record: they are summed on read
+    from csr.organization.counter shards, so concurrent approvals never
+    write (and serialize on) this row.
     """
     _name = 'csr.organization'
     _description = 'Organization CSR Dashboard'
@@ -14,7 +19,7 @@ class CSROrganization(models.Model):
     sdg_metrics = fields.Text(
         string="SDG Contribution Metrics (JSON)",
         compute='_compute_sdg_metrics',
-        store=True,
+        store=False,
         compute_sudo=False,  
         help="JSON string storing total impact points per SDG."
     )
@@ -39,29 +44,29 @@ class CSROrganization(models.Model):
     total_approved_activities = fields.Integer(
         string="Total Approved Activities",
         compute='_compute_organization_metrics',
-        store=True
+        store=False
     )
     total_offset_estimate = fields.Float(
         string="Total CO₂ Offset (kg)",
         compute='_compute_organization_metrics',
-        store=True
+        store=False
     )
     
     # --- Metrics computed from csr.department ---
     department_carbon_budget = fields.Float(
         string="Total Carbon Budget (kg)",
         compute='_compute_department_metrics',
-        store=True
+        store=False
     )
     current_carbon_used = fields.Float(
         string="Total Carbon Used (kg)",
         compute='_compute_department_metrics',
-        store=True
+        store=False
     )
     budget_usage_percentage = fields.Float(
         string="Total Budget Usage (%)",
         compute='_compute_department_metrics',
-        store=True
+        store=False
     )
     
     # --- AI/Gemini Placeholder Field ---
@@ -79,36 +84,28 @@ class CSROrganization(models.Model):
         store=False
     )
 
-    @api.depends('name') # Re-compute when activities are approved
+    @api.depends('name')
     def _compute_organization_metrics(self):
         """
-        This compute method should be triggered manually by 'csr.activity'
-        or run on a cron job.
+        Sums the sharded counters incremented by 'csr.activity' approvals.
         """
+        totals = self.env['csr.organization.counter']._get_totals(self)
         for rec in self:
-            approved_activities = self.env['csr.activity'].search([('status', '=', 'approved')])
-            rec.total_approved_activities = len(approved_activities)
-            rec.total_offset_estimate = sum(approved_activities.mapped('carbon_offset_estimate'))
+            sdg_totals = totals.get(rec.id, {}).values()
+            rec.total_approved_activities = sum(data['activity_count'] for data in sdg_totals)
+            rec.total_offset_estimate = sum(data['carbon_offset_estimate'] for data in sdg_totals)
 
-    @api.depends('total_approved_activities') # Depends on the result of _compute_organization_metrics
+    @api.depends('name')
     def _compute_sdg_metrics(self):
+        totals = self.env['csr.organization.counter']._get_totals(self)
         for rec in self:
-            approved_activities = self.env['csr.activity'].search([('status', '=', 'approved')])
-            
-            # 1. Calculate total impact points per SDG
-            sdg_impact = {}
-            total_impact = 0
-            for activity in approved_activities:
-                sdg = activity.sdg_category
-                points = activity.impact_points
-                sdg_impact[sdg] = sdg_impact.get(sdg, 0) + points
-                total_impact += points
-            
+            # 1. Total impact points per SDG, from the sharded counters
+            sdg_impact = {sdg: data['impact_points'] for sdg, data in totals.get(rec.id, {}).items()}
+            total_impact = sum(sdg_impact.values())
+
             # 2. Calculate percentage contribution and store as JSON
             sdg_percentages = {}
-            sdg_codes = [f"sdg{i}" for i in range(1, 18)] + ['other']
-            
-            for sdg in sdg_codes:
+            for sdg in SDG_CODES:
                 impact = sdg_impact.get(sdg, 0)
                 percentage = (impact / total_impact) * 100 if total_impact > 0 else 0
                 sdg_percentages[sdg] = {'impact': impact, 'percentage': round(percentage, 2)}
@@ -190,17 +187,20 @@ class CSROrganization(models.Model):
             # Join all cards into a single row
             rec.sdg_metrics_html = f"""<div class="row">{"".join(html_cards)}</div>"""
 
-    @api.depends('name') # Re-compute when department budgets change
+    @api.depends('name')
     def _compute_department_metrics(self):
         """
-        This compute method should be triggered manually by 'csr.department'
-        or run on a cron job.
+        Sums the department budgets (one aggregate query, nothing stored here).
         """
+        department_data = self.env['csr.department'].read_group(
+            domain=[],
+            fields=['carbon_budget:sum', 'carbon_used:sum'],
+            groupby=[],
+            lazy=False
+        )
+        total_budget = (department_data and department_data[0]['carbon_budget']) or 0.0
+        total_used = (department_data and department_data[0]['carbon_used']) or 0.0
         for rec in self:
-            all_depts = self.env['csr.department'].search([])
-            total_budget = sum(all_depts.mapped('carbon_budget'))
-            total_used = sum(all_depts.mapped('carbon_used'))
-            
             rec.department_carbon_budget = total_budget
             rec.current_carbon_used = total_used
             if total_budget > 0:
@@ -232,40 +232,64 @@ class CSROrganization(models.Model):
         Finds opportunities that match the top 3 lacking SDGs.
         """
         for rec in self:
-            if not rec.sdg_metrics:
-                rec.opportunity_ids = [(5, 0, 0)] # Set to empty
-                continue
-            
-            try:
-                sdg_percentages = json.loads(rec.sdg_metrics)
-            except (json.JSONDecodeError, TypeError):
-                rec.opportunity_ids = [(5, 0, 0)]
-                continue
-
-            # Filter out 'other' before sorting
-            filtered_sdgs = {k: v for k, v in sdg_percentages.items() if k != 'other'}
-            
-            # Determine Lacking SDGs (Top 3 lowest percentages)
-            sorted_sdgs = sorted(filtered_sdgs.items(), key=lambda item: item[1]['percentage'])
-            lacking_sdg_codes = [item[0] for item in sorted_sdgs][:3] # Get top 3 lacking
-            
+            lacking_sdg_codes = rec._get_lacking_sdg_codes()
             if not lacking_sdg_codes:
                 rec.opportunity_ids = [(5, 0, 0)] # No lacking SDGs, no opportunities to show
                 continue
                 
-            # Search for opportunities that match these codes
-            opportunity_recs = self.env['csr.opportunity'].search([('linked_sdg', 'in', lacking_sdg_codes)])
+            # Search for opportunities that match these codes (on the indexed SDG link)
+            sdg_ids = self.env['csr.sdg']._get_id_by_key()
+            opportunity_recs = self.env['csr.opportunity'].search([('linked_sdg_id', 'in', [sdg_ids[code] for code in lacking_sdg_codes if code in sdg_ids])])
             rec.opportunity_ids = opportunity_recs
 
+    def _get_lacking_sdg_codes(self, limit=3):
+        """
+        Returns the codes of the `limit` SDGs with the lowest share of impact
+        points ('other' excluded), lowest first. Empty when the SDG metrics
+        are missing or unreadable.
+        """
+        self.ensure_one()
+        if not self.sdg_metrics:
+            return []
+        try:
+            sdg_percentages = json.loads(self.sdg_metrics)
+            filtered_sdgs = {k: v for k, v in sdg_percentages.items() if k != 'other'}
+            sorted_sdgs = sorted(filtered_sdgs.items(), key=lambda item: item[1]['percentage'])
+        except (json.JSONDecodeError, TypeError, KeyError, AttributeError):
+            return []
+        return [code for code, _data in sorted_sdgs][:limit]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['csr.organization.counter']._rebuild(records)
+        return records
+
+    def _increment_activity_counters(self, activity):
+        """
+        Adds a newly approved activity to the sharded dashboard counters.
+        """
+        for rec in self:
+            self.env['csr.organization.counter']._increment(
+                rec, activity.sdg_id.id,
+                activity_count=1,
+                impact_points=activity.impact_points,
+                carbon_offset_estimate=activity.carbon_offset_estimate,
+            )
+        self.invalidate_recordset([
+            'total_approved_activities', 'total_offset_estimate', 'sdg_metrics',
+            'lacking_sdgs_display', 'sdg_metrics_html', 'recommendation_text', 'opportunity_ids',
+        ])
+
     def action_refresh_dashboard_metrics(self):
         """
         Button on the dashboard to manually refresh all metrics.
+        Recounts the sharded counters from the activity data, so any drift
+        (e.g. an approved activity edited or deleted) is corrected.
         """
         self.ensure_one()
-        self._compute_organization_metrics()
-        self._compute_sdg_metrics() # This will trigger the display compute
-        self._compute_department_metrics()
-        self._compute_ai_recommendations()
+        self.env['csr.organization.counter']._rebuild(self)
+        self.invalidate_recordset()
         
         # Also trigger the opportunity fetch
         self.env['csr.opportunity']._fetch_opportunities_from_globalgiving()
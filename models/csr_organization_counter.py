@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, api, _
+import random
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Approvals spread their increments over this many rows per SDG, so
+# concurrent transactions rarely update the same row. Rows are keyed by the
+# integer csr.sdg id, which keeps the table and its unique index narrow.
+COUNTER_SHARDS = 16
+
+
+class CSROrganizationCounter(models.Model):
+    """
+    Sharded counters behind the organization dashboard totals.
+    Each approval increments one randomly chosen shard row instead of
+    writing the csr.organization record; totals are summed on read and
+    the shards are periodically folded back into shard 0.
+    """
+    _name = 'csr.organization.counter'
+    _description = 'CSR Organization Counter Shard'
+    _order = 'organization_id, sdg_id, shard'
+    _log_access = False
+
+    organization_id = fields.Many2one('csr.organization', string="Organization", required=True, ondelete='cascade', index=True)
+    shard = fields.Integer(string="Shard", required=True, default=0)
+    sdg_id = fields.Many2one('csr.sdg', string="SDG", required=True, ondelete='cascade')
+
+    activity_count = fields.Integer(string="Approved Activities", default=0)
+    impact_points = fields.Integer(string="Impact Points", default=0)
+    carbon_offset_estimate = fields.Float(string="CO₂ Offset Estimate (kg)", default=0.0)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS csr_organization_counter_key_uniq
+            ON csr_organization_counter (organization_id, sdg_id, shard)
+        """)
+
+    @api.model
+    def _ensure_shards(self, organizations):
+        """Creates missing shard rows so increments never have to insert."""
+        if not organizations:
+            return
+        self.env.cr.execute("""
+            INSERT INTO csr_organization_counter (organization_id, shard, sdg_id, activity_count, impact_points, carbon_offset_estimate)
+            SELECT org.id, shard, sdg.id, 0, 0, 0
+            FROM unnest(%s::int[]) AS org(id), generate_series(0, %s - 1) AS shard, csr_sdg sdg
+            ON CONFLICT (organization_id, sdg_id, shard) DO NOTHING
+        """, (organizations.ids, COUNTER_SHARDS))
+
+    @api.model
+    def _increment(self, organization, sdg_id, activity_count=0, impact_points=0, carbon_offset_estimate=0.0):
+        """
+        Adds deltas to one random shard of the organization's counters.
+        Only that shard row is locked, so concurrent approvals do not
+        serialize on a single row.
+        """
+        sdg_id = sdg_id or self.env['csr.sdg']._get_id_by_key()['other']
+        self.env.cr.execute("""
+            INSERT INTO csr_organization_counter (organization_id, shard, sdg_id, activity_count, impact_points, carbon_offset_estimate)
+            VALUES (%(org)s, %(shard)s, %(sdg)s, %(count)s, %(points)s, %(offset)s)
+            ON CONFLICT (organization_id, sdg_id, shard) DO UPDATE SET
+                activity_count = csr_organization_counter.activity_count + EXCLUDED.activity_count,
+                impact_points = csr_organization_counter.impact_points + EXCLUDED.impact_points,
+                carbon_offset_estimate = csr_organization_counter.carbon_offset_estimate + EXCLUDED.carbon_offset_estimate
+        """, {
+            'org': organization.id,
+            'shard': random.randrange(COUNTER_SHARDS),
+            'sdg': sdg_id,
+            'count': activity_count,
+            'points': impact_points,
+            'offset': carbon_offset_estimate,
+        })
+        self.invalidate_model()
+
+    @api.model
+    def _get_totals(self, organizations):
+        """
+        Sums the shards of each organization.
+        Returns {organization_id: {sdg_key: {'activity_count', 'impact_points', 'carbon_offset_estimate'}}}
+        """
+        groups = self.sudo().read_group(
+            domain=[('organization_id', 'in', organizations.ids)],
+            fields=['activity_count:sum', 'impact_points:sum', 'carbon_offset_estimate:sum'],
+            groupby=['organization_id', 'sdg_id'],
+            lazy=False
+        )
+        sdg_keys = {sdg_id: key for key, sdg_id in self.env['csr.sdg'].sudo()._get_id_by_key().items()}
+        totals = {organization.id: {} for organization in organizations}
+        for group in groups:
+            totals[group['organization_id'][0]][sdg_keys[group['sdg_id'][0]]] = {
+                'activity_count': group['activity_count'] or 0,
+                'impact_points': group['impact_points'] or 0,
+                'carbon_offset_estimate': group['carbon_offset_estimate'] or 0.0,
+            }
+        return totals
+
+    @api.model
+    def _rebuild(self, organizations):
+        """
+        Resets the counters of the organizations from the activity data
+        (hot activities plus archived summaries), in shard 0.
+        """
+        if not organizations:
+            return
+        sdg_totals = self.env['csr.activity.summary'].sudo()._get_approved_totals('sdg_id')
+        # Activities without an SDG link are counted under 'other'
+        other_id = self.env['csr.sdg']._get_id_by_key()['other']
+        totals_by_sdg = {}
+        for sdg_id, data in sdg_totals.items():
+            totals = totals_by_sdg.setdefault(sdg_id or other_id, {'activity_count': 0, 'impact_points': 0, 'carbon_offset_estimate': 0.0})
+            for field_name in totals:
+                totals[field_name] += data[field_name] or 0
+        self.env.flush_all()
+        cr = self.env.cr
+        cr.execute("DELETE FROM csr_organization_counter WHERE organization_id = ANY(%s)", (organizations.ids,))
+        if totals_by_sdg:
+            sdg_ids = list(totals_by_sdg)
+            cr.execute("""
+                INSERT INTO csr_organization_counter (organization_id, shard, sdg_id, activity_count, impact_points, carbon_offset_estimate)
+                SELECT org.id, 0, v.sdg_id, v.activity_count, v.impact_points, v.carbon_offset_estimate
+                FROM unnest(%s::int[]) AS org(id),
+                     unnest(%s::int[], %s::int[], %s::int[], %s::float8[])
+                        AS v(sdg_id, activity_count, impact_points, carbon_offset_estimate)
+            """, (
+                organizations.ids,
+                sdg_ids,
+                [totals_by_sdg[sdg_id]['activity_count'] for sdg_id in sdg_ids],
+                [totals_by_sdg[sdg_id]['impact_points'] for sdg_id in sdg_ids],
+                [totals_by_sdg[sdg_id]['carbon_offset_estimate'] for sdg_id in sdg_ids],
+            ))
+        self._ensure_shards(organizations)
+        self.invalidate_model()
+
+    @api.model
+    def _fold(self, organizations):
+        """
+        Collapses all shards into shard 0 and recreates empty shards,
+        keeping the number of rows summed on read constant.
+        """
+        if not organizations:
+            return
+        self.env.flush_all()
+        cr = self.env.cr
+        cr.execute("""
+            SELECT organization_id, sdg_id, sum(activity_count), sum(impact_points), sum(carbon_offset_estimate)
+            FROM csr_organization_counter
+            WHERE organization_id = ANY(%s)
+            GROUP BY organization_id, sdg_id
+        """, (organizations.ids,))
+        rows = cr.fetchall()
+        # Under REPEATABLE READ, a shard incremented by a concurrent approval
+        # makes this DELETE fail with a serialization error instead of losing it
+        cr.execute("DELETE FROM csr_organization_counter WHERE organization_id = ANY(%s)", (organizations.ids,))
+        if rows:
+            organization_ids, sdg_ids, counts, points, offsets = (list(column) for column in zip(*rows))
+            cr.execute("""
+                INSERT INTO csr_organization_counter (organization_id, shard, sdg_id, activity_count, impact_points, carbon_offset_estimate)
+                SELECT org_id, 0, sdg_id, activity_count, impact_points, carbon_offset_estimate
+                FROM unnest(%s::int[], %s::int[], %s::int[], %s::int[], %s::float8[])
+                    AS v(org_id, sdg_id, activity_count, impact_points, carbon_offset_estimate)
+            """, (organization_ids, sdg_ids, counts, points, offsets))
+        self._ensure_shards(organizations)
+        self.invalidate_model()
+
+    @api.model
+    def _get_initialized_organization_ids(self):
+        """
+        Organizations whose counters were built by _rebuild, i.e. that have
+        the full set of shards. A lone shard inserted by an increment does
+        not count: the approvals before it were never added.
+        """
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT organization_id FROM csr_organization_counter
+            GROUP BY organization_id
+            HAVING count(*) >= %s
+        """, (COUNTER_SHARDS * self.env['csr.sdg'].search_count([]),))
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _rebuild_all(self):
+        """Recounts the counters of every organization (on module install and update)."""
+        organizations = self.env['csr.organization'].search([])
+        self._rebuild(organizations)
+        _logger.info("Rebuilt CSR counters for %s organizations.", len(organizations))
+        return True
+
+    @api.model
+    def _cron_fold_counters(self):
+        """
+        Periodic maintenance: folds the shards of every organization, and
+        initializes counters for organizations that have no full shard set yet.
+        """
+        organizations = self.env['csr.organization'].search([])
+        initialized_ids = self._get_initialized_organization_ids()
+        self._rebuild(organizations.filtered(lambda org: org.id not in initialized_ids))
+        self._fold(organizations.filtered(lambda org: org.id in initialized_ids))
+        _logger.info("Folded CSR counters for %s organizations.", len(organizations))
+        return True
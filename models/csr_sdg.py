@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, api, _
+from odoo.tools import SQL
+
+# The UN Sustainable Development Goals, shared by every SDG field of the module.
+# The number in each key is the SDG's small integer code (0 for 'other').
+SDG_SELECTION = [
+    ('sdg1', 'SDG 1: No Poverty'), ('sdg2', 'SDG 2: Zero Hunger'),  
+    ('sdg3', 'SDG 3: Good Health and Well-being'), ('sdg4', 'SDG 4: Quality Education'),
+    ('sdg5', 'SDG 5: Gender Equality'), ('sdg6', 'SDG 6: Clean Water and Sanitation'),
+    ('sdg7', 'SDG 7: Affordable and Clean Energy'), ('sdg8', 'SDG 8: Decent Work and Economic Growth'),
+    ('sdg9', 'SDG 9: Industry, Innovation, and Infrastructure'), ('sdg10', 'SDG 10: Reduced Inequality'),
+    ('sdg11', 'SDG 11: Sustainable Cities and Communities'), ('sdg12', 'SDG 12: Responsible Consumption and Production'),
+    ('sdg13', 'SDG 13: Climate Action'), ('sdg14', 'SDG 14: Life Below Water'),
+    ('sdg15', 'SDG 15: Life on Land'), ('sdg16', 'SDG 16: Peace and Justice Strong Institutions'),
+    ('sdg17', 'SDG 17: Partnerships to achieve the Goal'), ('other', 'Other/Not Classified')
+]
+SDG_CODES = [key for key, _label in SDG_SELECTION]
+
+
+class CSRSdg(models.Model):
+    """
+    Reference table of the SDGs. Activities and opportunities store a
+    Many2one to it (a 4-byte integer) next to their SDG selection key, and
+    aggregate queries and the dashboard counter shards are keyed on that
+    integer.
+    """
+    _name = 'csr.sdg'
+    _description = 'UN Sustainable Development Goal'
+    _order = 'code'
+
+    code = fields.Integer(string="SDG Number", required=True, help="0 for Other/Not Classified")
+    key = fields.Selection(SDG_SELECTION, string="Key", required=True, index=True)
+    name = fields.Char(string="Name", required=True, translate=True)
+
+    @api.model
+    def _get_id_by_key(self):
+        """Returns {'sdg1': id, ..., 'other': id}."""
+        return {sdg.key: sdg.id for sdg in self.search([])}
+
+    @api.model
+    def _backfill_sdg_ids(self):
+        """
+        Sets the SDG link of activities, opportunities and archive summaries
+        from their selection key where it is still empty.
+        """
+        self.env.flush_all()
+        for table, key_column, sdg_column in [
+            ('csr_activity', 'sdg_category', 'sdg_id'),
+            ('csr_opportunity', 'linked_sdg', 'linked_sdg_id'),
+            ('csr_activity_summary', 'sdg_category', 'sdg_id'),
+        ]:
+            # The SET target must not be table-qualified, unlike the WHERE operands
+            self.env.cr.execute(SQL(
+                "UPDATE %(table)s SET %(target)s = sdg.id FROM csr_sdg sdg WHERE %(sdg)s IS NULL AND sdg.key = COALESCE(%(key)s, 'other')",
+                table=SQL.identifier(table),
+                target=SQL.identifier(sdg_column),
+                sdg=SQL.identifier(table, sdg_column),
+                key=SQL.identifier(table, key_column),
+            ))
+        self.env.invalidate_all()
@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 import requests
 import json
+import re
+import zlib
+import hashlib
+import time
+import numpy as np
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 import logging  
@@ -18,9 +23,60 @@ GLOBALGIVING_API_KEY = "YOUR_GLOBALGIVING_API_KEY_PLACEHOLDER"
 
 LINKEDIN_API_URL = "https://api.linkedin.com/v2/ugcPosts"
 LINKEDIN_OAUTH_TOKEN = "YOUR_LINKEDIN_OAUTH_TOKEN_PLACEHOLDER"
+LINKEDIN_AUTHOR_URN = "urn:li:organization:0"
+LINKEDIN_TIMEOUT = 10
+# System parameters overriding the values above (e.g. to point at a local stub server)
+LINKEDIN_API_URL_PARAM = 'kaizen_greenflow.linkedin_api_url'
+LINKEDIN_OAUTH_TOKEN_PARAM = 'kaizen_greenflow.linkedin_oauth_token'
+LINKEDIN_AUTHOR_URN_PARAM = 'kaizen_greenflow.linkedin_author_urn'
 
 OPENSTREETMAP_API_URL = "https://nominatim.openstreetmap.org/search"
 
+# --- Duplicate Detection (MinHash / LSH) Configuration ---
+# 64 permutations split into 16 bands of 4 rows: descriptions with a Jaccard
+# similarity of ~0.8 collide in at least one band with >99% probability.
+MINHASH_NUM_PERMUTATIONS = 64
+MINHASH_NUM_BANDS = 16
+MINHASH_SHINGLE_SIZE = 3
+DUPLICATE_SIMILARITY_THRESHOLD = 0.8
+# Descriptions with fewer shingles are too generic ("Beach cleanup") to compare
+MINHASH_MIN_SHINGLES = 4
+# Bounds the work done per submission whatever the number of lookalikes
+DUPLICATE_CANDIDATES_PER_BAND = 50
+DUPLICATE_MAX_LINKED = 10
+
+# Permutations are (a * h + b) mod p with a and b drawn uniformly below p.
+# Shingle hashes are reduced mod p first, so a * h + b < 2**63 never
+# overflows uint64.
+_MINHASH_PRIME = (1 << 31) - 1
+# Fixed seed so signatures stay comparable across workers and restarts.
+_minhash_rng = np.random.RandomState(42)
+_MINHASH_A = _minhash_rng.randint(1, _MINHASH_PRIME, size=MINHASH_NUM_PERMUTATIONS).astype(np.uint64)
+_MINHASH_B = _minhash_rng.randint(1, _MINHASH_PRIME, size=MINHASH_NUM_PERMUTATIONS).astype(np.uint64)
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: allows `rate` calls per second on average,
+    with bursts of up to `capacity` calls.
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def consume(self):
+        """Blocks until a token is available, then takes it."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
+
 
 class CSRUtils(models.AbstractModel):
     _name = 'csr.utils'
@@ -112,6 +168,38 @@ class CSRUtils(models.AbstractModel):
         # We return the message to be shown in the success notification
         return message_to_post
 
+    @api.model
+    def post_linkedin_share(self, message):
+        """
+        Posts one share to LINKEDIN_API_URL and returns the id of the created post.
+        Raises requests.RequestException on network and HTTP errors.
+        While the OAuth token is still the placeholder, nothing is sent and a
+        simulated post id is returned.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        api_url = ICP.get_param(LINKEDIN_API_URL_PARAM, LINKEDIN_API_URL)
+        token = ICP.get_param(LINKEDIN_OAUTH_TOKEN_PARAM, LINKEDIN_OAUTH_TOKEN)
+        if token == LINKEDIN_OAUTH_TOKEN:
+            _logger.info("Simulating LinkedIn post (no OAuth token configured).")
+            return "simulated-%s" % hashlib.sha1(message.encode('utf-8')).hexdigest()[:12]
+
+        response = requests.post(api_url, json={
+            'author': ICP.get_param(LINKEDIN_AUTHOR_URN_PARAM, LINKEDIN_AUTHOR_URN),
+            'lifecycleState': 'PUBLISHED',
+            'specificContent': {
+                'com.linkedin.ugc.ShareContent': {
+                    'shareCommentary': {'text': message},
+                    'shareMediaCategory': 'NONE',
+                },
+            },
+            'visibility': {'com.linkedin.ugc.MemberNetworkVisibility': 'PUBLIC'},
+        }, headers={
+            'Authorization': f"Bearer {token}",
+            'X-Restli-Protocol-Version': '2.0.0',
+        }, timeout=LINKEDIN_TIMEOUT)
+        response.raise_for_status()
+        return response.headers.get('x-restli-id') or (response.content and response.json().get('id')) or False
+
     # --- 5. OPENSTREETMAP API SIMULATION (NEWLY ADDED) ---
     @api.model
     def get_simulated_map_pins(self, location_name):
@@ -133,3 +221,71 @@ class CSRUtils(models.AbstractModel):
                 'title': 'Beach Cleanup Event'
             }
         return None
+
+    # --- 6. TEXT FEATURES ---
+    @api.model
+    def get_description_keywords(self, text):
+        """
+        Returns the lowercased words of at least 4 letters in a text,
+        used as keyword features by the recommendation engine.
+        """
+        return {word for word in re.findall(r'[^\W\d_]+', (text or "").lower()) if len(word) >= 4}
+
+    # --- 7. DUPLICATE DETECTION (MINHASH / LSH) ---
+    @api.model
+    def get_description_shingles(self, text):
+        """
+        Normalizes a description and splits it into word shingles.
+        Short descriptions fall back to single words.
+        """
+        words = re.findall(r'\w+', (text or "").lower())
+        if len(words) < MINHASH_SHINGLE_SIZE:
+            return set(words)
+        return {
+            " ".join(words[i:i + MINHASH_SHINGLE_SIZE])
+            for i in range(len(words) - MINHASH_SHINGLE_SIZE + 1)
+        }
+
+    @api.model
+    def compute_minhash_signature(self, text):
+        """
+        Computes the MinHash signature of a description as a list of
+        MINHASH_NUM_PERMUTATIONS integers (empty list when the description
+        has fewer than MINHASH_MIN_SHINGLES shingles).
+        """
+        shingles = self.get_description_shingles(text)
+        if len(shingles) < MINHASH_MIN_SHINGLES:
+            return []
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) % _MINHASH_PRIME for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # One row per shingle, one column per permutation: take the column minimum
+        permuted = (np.outer(hashes, _MINHASH_A) + _MINHASH_B) % np.uint64(_MINHASH_PRIME)
+        return permuted.min(axis=0).tolist()
+
+    @api.model
+    def get_minhash_band_keys(self, signature):
+        """
+        Splits a MinHash signature into LSH band keys. Two descriptions are
+        candidate duplicates when they share at least one band key.
+        """
+        if not signature:
+            return []
+        rows = len(signature) // MINHASH_NUM_BANDS
+        keys = []
+        for band in range(MINHASH_NUM_BANDS):
+            band_values = ",".join(str(v) for v in signature[band * rows:(band + 1) * rows])
+            digest = hashlib.blake2b(band_values.encode('utf-8'), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+    @api.model
+    def estimate_minhash_similarity(self, signature_a, signature_b):
+        """
+        Estimates the Jaccard similarity of two descriptions from their signatures.
+        """
+        if not signature_a or not signature_b or len(signature_a) != len(signature_b):
+            return 0.0
+        matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+        return matches / len(signature_a)
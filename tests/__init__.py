@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+from . import test_duplicate_detection
+from . import test_opportunity_search
+from . import test_activity_archive
+from . import test_linkedin_outbox
+from . import test_organization_counters
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestActivityArchive(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.department_a, cls.department_b = cls.env['hr.department'].create([
+            {'name': 'Archive Test A'},
+            {'name': 'Archive Test B'},
+        ])
+        cls.csr_department_a, cls.csr_department_b = cls.env['csr.department'].create([
+            {'department_id': cls.department_a.id, 'carbon_budget': 1000.0},
+            {'department_id': cls.department_b.id, 'carbon_budget': 1000.0},
+        ])
+        cls.employee = cls.env['hr.employee'].create({'name': 'Archive Tester', 'department_id': cls.department_a.id})
+        cls.profile = cls.env['csr.employee.profile'].create({'employee_id': cls.employee.id})
+        cls.organization = cls.env['csr.organization'].search([], limit=1) or cls.env['csr.organization'].create({})
+
+        old_date = fields.Date.today() - relativedelta(years=3)
+        activities = cls.env['csr.activity'].create([{
+            'name': name,
+            'employee_profile_id': cls.profile.id,
+            'date': activity_date,
+            'hours': hours,
+            'donation_amount': donation,
+            'description': description,
+        } for name, activity_date, hours, donation, description in [
+            ('Old beach cleanup', old_date, 4.0, 10.0, 'Beach cleanup with the marine team'),
+            ('Old tree planting', old_date, 3.0, 0.0, 'Tree planting in the forest'),
+            ('Old tutoring', old_date, 2.0, 25.0, 'Tutoring at the school'),
+            ('Recent tree planting', fields.Date.today(), 5.0, 0.0, 'Tree planting in the park forest'),
+        ]])
+        for activity in activities:
+            activity.action_approve()
+        cls.env['csr.activity'].create({
+            'name': 'Old rejected',
+            'employee_profile_id': cls.profile.id,
+            'date': old_date,
+            'hours': 6.0,
+            'description': 'Food bank',
+        }).action_reject()
+
+    def _get_totals(self):
+        self.env.invalidate_all()
+        self.profile._compute_csr_metrics()
+        (self.csr_department_a | self.csr_department_b)._compute_carbon_metrics()
+        return {
+            'profile': (self.profile.total_impact_points, self.profile.volunteering_hours, self.profile.donation_amount),
+            'department_a': (self.csr_department_a.total_carbon_offset, self.csr_department_a.carbon_used),
+            'department_b': (self.csr_department_b.total_carbon_offset, self.csr_department_b.carbon_used),
+            'organization': (
+                self.organization.total_approved_activities,
+                self.organization.total_offset_estimate,
+                self.organization.sdg_metrics,
+            ),
+        }
+
+    def test_archive_preserves_totals(self):
+        before = self._get_totals()
+        self.assertTrue(before['profile'][0])
+
+        self.env['csr.activity.archive']._cron_archive_activities()
+        self.assertEqual(len(self.profile.activity_ids), 1, "Only the recent activity stays in the hot table")
+        self.assertEqual(len(self.profile.archived_activity_ids), 4)
+        self.assertEqual(self._get_totals(), before)
+
+        # Recounting the organization counters from hot + summary rows gives the same totals
+        self.env['csr.organization.counter']._rebuild(self.organization)
+        self.assertEqual(self._get_totals(), before)
+
+    def test_archive_follows_department_change(self):
+        self.env['csr.activity.archive']._cron_archive_activities()
+        before = self._get_totals()
+
+        self.employee.department_id = self.department_b
+        after = self._get_totals()
+        self.assertEqual(after['department_b'], before['department_a'], "Hot and archived totals both follow the employee")
+        self.assertEqual(after['department_a'], (0.0, 0.0))
+        self.assertEqual(after['profile'], before['profile'])
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import random
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDuplicateDetection(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.utils = cls.env['csr.utils']
+
+    def _exact_jaccard(self, text_a, text_b):
+        shingles_a = self.utils.get_description_shingles(text_a)
+        shingles_b = self.utils.get_description_shingles(text_b)
+        return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+    def _estimated_jaccard(self, text_a, text_b):
+        return self.utils.estimate_minhash_similarity(
+            self.utils.compute_minhash_signature(text_a),
+            self.utils.compute_minhash_signature(text_b),
+        )
+
+    def test_minhash_estimate_single_word_change(self):
+        text_a = "Spent Saturday morning cleaning the beach with the local marine conservation group near the harbour"
+        text_b = text_a.replace("Saturday", "Sunday")
+        exact = self._exact_jaccard(text_a, text_b)
+        self.assertAlmostEqual(self._estimated_jaccard(text_a, text_b), exact, delta=0.15)
+
+    def test_minhash_estimate_identical_and_disjoint(self):
+        text = "Planted two hundred trees along the river bank with the forestry volunteers"
+        self.assertEqual(self._estimated_jaccard(text, text), 1.0)
+        other = "Tutored primary school pupils in mathematics every Wednesday afternoon at the library"
+        self.assertLess(self._estimated_jaccard(text, other), 0.1)
+
+    def test_minhash_estimate_matches_jaccard(self):
+        rng = random.Random(1)
+        vocabulary = [f"word{i}" for i in range(500)]
+        errors = []
+        for _i in range(100):
+            words = rng.choices(vocabulary, k=40)
+            edited = list(words)
+            edited[rng.randrange(len(edited))] = rng.choice(vocabulary)
+            text_a, text_b = " ".join(words), " ".join(edited)
+            errors.append(abs(self._estimated_jaccard(text_a, text_b) - self._exact_jaccard(text_a, text_b)))
+        self.assertLess(sum(errors) / len(errors), 0.08)
+        self.assertLess(max(errors), 0.25)
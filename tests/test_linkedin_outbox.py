@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import patch
+
+import requests
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.kaizen_greenflow.models.csr_linkedin_share import SHARE_MAX_ATTEMPTS, SHARE_RETRY_BASE_DELAY
+
+STUB_API_URL = 'http://localhost:8069/linkedin-stub/ugcPosts'
+
+
+def _response(status, headers=None, content=b''):
+    response = requests.Response()
+    response.status_code = status
+    response.url = STUB_API_URL
+    response.headers.update(headers or {})
+    response._content = content
+    return response
+
+
+@tagged('post_install', '-at_install')
+class TestLinkedInOutbox(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ICP = cls.env['ir.config_parameter'].sudo()
+        ICP.set_param('kaizen_greenflow.linkedin_api_url', STUB_API_URL)
+        ICP.set_param('kaizen_greenflow.linkedin_oauth_token', 'test-token')
+        ICP.set_param('kaizen_greenflow.linkedin_rate_per_second', 1000)
+        employee = cls.env['hr.employee'].create({'name': 'Outbox Tester'})
+        cls.profile = cls.env['csr.employee.profile'].create({'employee_id': employee.id})
+
+    def _create_share(self, **values):
+        return self.env['csr.linkedin.share'].create({
+            'employee_profile_id': self.profile.id,
+            'message': 'We planted 200 trees!',
+            **values,
+        })
+
+    def _send(self, share, response=None, side_effect=None):
+        with patch.object(requests, 'post', return_value=response, side_effect=side_effect) as post:
+            retry_after = share._send()
+        self.assertEqual(post.call_args.args[0], STUB_API_URL)
+        return retry_after
+
+    def assertNextAttemptIn(self, share, seconds):
+        self.assertAlmostEqual(share.next_attempt_date, fields.Datetime.now() + timedelta(seconds=seconds), delta=timedelta(seconds=5))
+
+    def test_sent(self):
+        share = self._create_share()
+        self.assertIsNone(self._send(share, _response(201, {'x-restli-id': 'urn:li:share:42'})))
+        self.assertEqual(share.state, 'sent')
+        self.assertEqual(share.attempt_count, 1)
+        self.assertEqual(share.linkedin_post_id, 'urn:li:share:42')
+        self.assertTrue(share.sent_date)
+        self.assertFalse(share.last_error)
+
+    def test_rate_limited(self):
+        share = self._create_share()
+        self.assertEqual(self._send(share, _response(429, {'Retry-After': '120'})), 120)
+        self.assertEqual(share.state, 'queued')
+        self.assertEqual(share.attempt_count, 0, "A rate limit does not count as an attempt")
+        self.assertNextAttemptIn(share, 120)
+
+    def test_rate_limited_http_date(self):
+        share = self._create_share()
+        retry_date = datetime.now(timezone.utc) + timedelta(seconds=300)
+        retry_after = self._send(share, _response(429, {'Retry-After': format_datetime(retry_date, usegmt=True)}))
+        self.assertAlmostEqual(retry_after, 300, delta=5)
+        self.assertEqual(share.state, 'queued')
+        self.assertEqual(share.attempt_count, 0)
+        self.assertNextAttemptIn(share, 300)
+
+    def test_server_error_backoff(self):
+        share = self._create_share()
+        self.assertIsNone(self._send(share, _response(503)))
+        self.assertEqual(share.state, 'queued')
+        self.assertEqual(share.attempt_count, 1)
+        self.assertNextAttemptIn(share, SHARE_RETRY_BASE_DELAY)
+
+        self._send(share, _response(502))
+        self.assertEqual(share.attempt_count, 2)
+        self.assertNextAttemptIn(share, SHARE_RETRY_BASE_DELAY * 2)
+
+    def test_server_error_max_attempts(self):
+        share = self._create_share(attempt_count=SHARE_MAX_ATTEMPTS - 1)
+        self._send(share, _response(500))
+        self.assertEqual(share.state, 'failed')
+        self.assertEqual(share.attempt_count, SHARE_MAX_ATTEMPTS)
+
+    def test_client_error_fails(self):
+        share = self._create_share()
+        self.assertIsNone(self._send(share, _response(401)))
+        self.assertEqual(share.state, 'failed')
+        self.assertEqual(share.attempt_count, 1)
+        self.assertFalse(share.next_attempt_date)
+
+    def test_network_error_backoff(self):
+        share = self._create_share()
+        self._send(share, side_effect=requests.ConnectionError("connection refused"))
+        self.assertEqual(share.state, 'queued')
+        self.assertEqual(share.attempt_count, 1)
+        self.assertNextAttemptIn(share, SHARE_RETRY_BASE_DELAY)
+
+    def test_unexpected_error_backoff(self):
+        share = self._create_share()
+        self._send(share, side_effect=RuntimeError("unexpected"))
+        self.assertEqual(share.state, 'queued')
+        self.assertEqual(share.attempt_count, 1)
+        self.assertIn("unexpected", share.last_error)
+        self.assertNextAttemptIn(share, SHARE_RETRY_BASE_DELAY)
+
+    def test_cron_pauses_queue_on_rate_limit(self):
+        first, second = self._create_share(), self._create_share()
+        with patch.object(requests, 'post', return_value=_response(429, {'Retry-After': '60'})) as post:
+            self.env['csr.linkedin.share']._cron_send_queued_shares()
+        self.assertEqual(post.call_count, 1, "The queue stops at the first rate-limited share")
+        self.assertNextAttemptIn(first, 60)
+        self.assertFalse(second.next_attempt_date)
+
+        with patch.object(requests, 'post', return_value=_response(201, {'x-restli-id': 'urn:li:share:1'})) as post:
+            self.env['csr.linkedin.share']._cron_send_queued_shares()
+        self.assertEqual(post.call_count, 1, "The paused share is not due yet")
+        self.assertEqual(second.state, 'sent')
+        self.assertEqual(first.state, 'queued')
+
+    def test_parse_retry_after(self):
+        Share = self.env['csr.linkedin.share']
+        self.assertEqual(Share._parse_retry_after('120'), 120)
+        self.assertEqual(Share._parse_retry_after(None), SHARE_RETRY_BASE_DELAY)
+        self.assertEqual(Share._parse_retry_after('soon'), SHARE_RETRY_BASE_DELAY)
+        self.assertEqual(Share._parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 1, "A past date means retry now")
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestOpportunitySearch(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Opportunity = cls.env['csr.opportunity']
+        cls.beach = Opportunity.create({
+            'name': 'Beach Cleanup Drive',
+            'ngo': 'Ocean Friends',
+            'description': 'Collect plastic waste along the coastline.',
+            'linked_sdg': 'sdg14',
+        })
+        cls.school = Opportunity.create({
+            'name': 'School Tutoring',
+            'ngo': 'Learning Together',
+            'description': 'Help pupils with their homework.',
+            'linked_sdg': 'sdg4',
+        })
+
+    def test_search_text(self):
+        # Runs the full-text condition, and the trigram fallback when pg_trgm is installed
+        opportunities = self.env['csr.opportunity'].search([('search_text', 'ilike', 'x')])
+        self.assertNotIn(self.school, opportunities)
+
+        opportunities = self.env['csr.opportunity'].search([('search_text', 'ilike', 'coastline')])
+        self.assertIn(self.beach, opportunities)
+        self.assertNotIn(self.school, opportunities)
+
+    def test_search_text_typo(self):
+        if not self.env.registry.has_trigram:
+            self.skipTest("pg_trgm is not installed")
+        opportunities = self.env['csr.opportunity'].search([('search_text', 'ilike', 'Beach Claenup Drive')])
+        self.assertIn(self.beach, opportunities)
+
+    def test_search_ranked(self):
+        result = self.env['csr.opportunity'].search_ranked('plastic waste', domain=[('id', 'in', (self.beach | self.school).ids)])
+        self.assertEqual(result['total'], 1)
+        self.assertEqual(result['records'][0]['id'], self.beach.id)
+        self.assertEqual(result['facets']['linked_sdg'], {'sdg14': 1})
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.kaizen_greenflow.models.csr_organization_counter import COUNTER_SHARDS
+
+
+@tagged('post_install', '-at_install')
+class TestOrganizationCounters(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        employee = cls.env['hr.employee'].create({'name': 'Counter Tester'})
+        cls.profile = cls.env['csr.employee.profile'].create({'employee_id': employee.id})
+        cls.organization = cls.env['csr.organization'].search([], limit=1) or cls.env['csr.organization'].create({})
+        cls.Counter = cls.env['csr.organization.counter']
+        # Start from counters that match the approved activities of the database
+        cls.Counter._rebuild(cls.organization)
+
+    def _create_activity(self, hours=4.0, description='Beach cleanup with the marine team'):
+        return self.env['csr.activity'].create({
+            'name': 'Counter test activity',
+            'employee_profile_id': self.profile.id,
+            'hours': hours,
+            'description': description,
+            'status': 'submitted',
+        })
+
+    def _get_totals(self):
+        self.organization.invalidate_recordset()
+        return (
+            self.organization.total_approved_activities,
+            self.organization.total_offset_estimate,
+            json.loads(self.organization.sdg_metrics),
+        )
+
+    def _get_shard_rows(self):
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT shard, activity_count FROM csr_organization_counter WHERE organization_id = %s
+        """, (self.organization.id,))
+        return self.env.cr.fetchall()
+
+    def test_approval_updates_totals(self):
+        count, offset, sdg_metrics = self._get_totals()
+        activity = self._create_activity()
+        self.assertEqual(self._get_totals()[0], count, "Submitted activities are not counted")
+
+        activity.action_approve()
+        self.assertEqual(activity.sdg_category, 'sdg14')
+        self.assertTrue(activity.impact_points)
+        new_count, new_offset, new_sdg_metrics = self._get_totals()
+        self.assertEqual(new_count, count + 1)
+        self.assertAlmostEqual(new_offset, offset + activity.carbon_offset_estimate)
+        self.assertEqual(new_sdg_metrics['sdg14']['impact'], sdg_metrics['sdg14']['impact'] + activity.impact_points)
+        self.assertEqual(new_sdg_metrics['sdg4']['impact'], sdg_metrics['sdg4']['impact'])
+
+    def test_rejection_leaves_totals(self):
+        before = self._get_totals()
+        self._create_activity().action_reject()
+        self.assertEqual(self._get_totals(), before)
+
+    def test_fold_keeps_totals(self):
+        for hours, description in [(4.0, 'Beach cleanup'), (2.0, 'Tree planting in the forest'), (3.0, 'Tutoring at the school')]:
+            self._create_activity(hours, description).action_approve()
+        before = self._get_totals()
+        sdg_count = self.env['csr.sdg'].search_count([])
+
+        self.Counter._cron_fold_counters()
+        self.assertEqual(self._get_totals(), before)
+        shard_rows = self._get_shard_rows()
+        self.assertEqual(len(shard_rows), COUNTER_SHARDS * sdg_count)
+        self.assertFalse([shard for shard, activity_count in shard_rows if shard and activity_count],
+                         "Folding moves every count into shard 0")
+
+        # Folding again, after more approvals, still adds up
+        activity = self._create_activity()
+        activity.action_approve()
+        before = self._get_totals()
+        self.Counter._cron_fold_counters()
+        self.assertEqual(self._get_totals(), before)
+        self.assertEqual(len(self._get_shard_rows()), COUNTER_SHARDS * sdg_count)
+
+    def test_rebuild_matches_approved_activities(self):
+        self._create_activity().action_approve()
+        before = self._get_totals()
+        expected_count = sum(data['activity_count'] for data in self.env['csr.activity.summary']._get_approved_totals().values())
+        self.assertEqual(before[0], expected_count)
+
+        self.Counter._rebuild(self.organization)
+        self.assertEqual(self._get_totals(), before)
+        shard_rows = self._get_shard_rows()
+        self.assertEqual(len(shard_rows), COUNTER_SHARDS * self.env['csr.sdg'].search_count([]))
+        self.assertFalse([shard for shard, activity_count in shard_rows if shard and activity_count],
+                         "A rebuild writes the totals into shard 0")
+        self.assertIn(self.organization.id, self.Counter._get_initialized_organization_ids())
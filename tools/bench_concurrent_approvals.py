@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent approval load test for the organization dashboard counters.
+
+Seeds submitted activities, then approves them from several threads, each
+with its own database cursor (REPEATABLE READ, like Odoo requests), and
+reports the approval throughput and the serialization failures.
+Failed approvals are retried the way the Odoo RPC layer retries them.
+
+Run it once on the code before the sharded counters and once after, on a
+throwaway copy of a database with the module installed:
+
+    python tools/bench_concurrent_approvals.py -c odoo.conf -d bench_db --threads 16 --approvals 2000
+
+Seeded activities are committed and left in the database.
+"""
+import argparse
+import random
+import threading
+import time
+
+from psycopg2 import errors
+
+import odoo
+from odoo import api, SUPERUSER_ID
+from odoo.modules.registry import Registry
+
+MAX_RETRIES = 5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('-c', '--config', help="Odoo configuration file")
+    parser.add_argument('-d', '--database', required=True, help="Database with kaizen_greenflow installed")
+    parser.add_argument('--threads', type=int, default=8, help="Concurrent approvers")
+    parser.add_argument('--approvals', type=int, default=1000, help="Activities to approve")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    return parser.parse_args()
+
+
+def seed_activities(registry, count, rng):
+    """Creates `count` submitted activities spread over the existing profiles."""
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {'tracking_disable': True})
+        profiles = env['csr.employee.profile'].search([])
+        if not profiles:
+            raise SystemExit("No csr.employee.profile in the database: load the demo data first.")
+        descriptions = [
+            "Beach cleanup with the marine conservation team",
+            "Tree planting in the city forest",
+            "Tutoring at the local school",
+            "Volunteering at the food bank against hunger",
+            "Health awareness day at the hospital",
+        ]
+        activities = env['csr.activity'].create([{
+            'name': f"Load test approval {i}",
+            'employee_profile_id': rng.choice(profiles).id,
+            'hours': rng.randint(1, 8),
+            'description': rng.choice(descriptions),
+            'status': 'submitted',
+        } for i in range(count)])
+        return activities.ids
+
+
+def approve_worker(registry, activity_ids, stats, lock):
+    approved = failures = aborted = 0
+    for activity_id in activity_ids:
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with registry.cursor() as cr:
+                    env = api.Environment(cr, SUPERUSER_ID, {})
+                    env['csr.activity'].browse(activity_id).action_approve()
+                approved += 1
+                break
+            except errors.SerializationFailure:
+                failures += 1
+                if attempt == MAX_RETRIES:
+                    aborted += 1
+                else:
+                    time.sleep(random.uniform(0.0, 0.1 * 2 ** attempt))
+    with lock:
+        stats['approved'] += approved
+        stats['serialization_failures'] += failures
+        stats['aborted'] += aborted
+
+
+def main():
+    args = parse_args()
+    config_args = ['-d', args.database] + (['-c', args.config] if args.config else [])
+    odoo.tools.config.parse_config(config_args)
+    registry = Registry(args.database)
+    rng = random.Random(args.seed)
+
+    activity_ids = seed_activities(registry, args.approvals, rng)
+    chunks = [activity_ids[i::args.threads] for i in range(args.threads)]
+    stats = {'approved': 0, 'serialization_failures': 0, 'aborted': 0}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=approve_worker, args=(registry, chunk, stats, lock)) for chunk in chunks]
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    print(f"threads:                {args.threads}")
+    print(f"approvals:              {stats['approved']} / {len(activity_ids)}")
+    print(f"elapsed:                {elapsed:.2f} s")
+    print(f"throughput:             {stats['approved'] / elapsed:.1f} approvals/s")
+    print(f"serialization failures: {stats['serialization_failures']}")
+    print(f"aborted after retries:  {stats['aborted']}")
+
+
+if __name__ == '__main__':
+    main()
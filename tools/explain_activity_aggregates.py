@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Seeds csr.activity with synthetic rows and prints the query plans of the hot
+aggregate queries, to check they use the partial covering indexes.
+
+Rows are inserted with set-based SQL (not through the ORM), spread over the
+existing employee profiles, SDGs and the last three years, with the status
+mix of a mature database (mostly approved). The table is then vacuumed so
+index-only scans can skip the heap.
+
+    python tools/explain_activity_aggregates.py --dsn "dbname=bench_db" --rows 1000000
+
+Use a throwaway copy of a database with the module installed; --cleanup
+deletes the seeded rows afterwards.
+"""
+import argparse
+import time
+
+import psycopg2
+
+SEED_NAME_PREFIX = 'EXPLAIN seed'
+
+# Same shapes as the SQL generated for csr.activity.summary._get_approved_totals()
+# and the department budget forecast.
+AGGREGATE_QUERIES = {
+    'department totals': """
+        SELECT department_id, count(*), sum(hours), sum(donation_amount), sum(impact_points), sum(carbon_offset_estimate)
+        FROM csr_activity
+        WHERE status = 'approved' AND department_id = ANY(%(department_ids)s)
+        GROUP BY department_id
+    """,
+    'department daily usage (forecast)': """
+        SELECT department_id, date, sum(carbon_offset_estimate)
+        FROM csr_activity
+        WHERE status = 'approved' AND department_id = ANY(%(department_ids)s)
+          AND date >= date_trunc('year', now())::date AND date <= now()::date
+        GROUP BY department_id, date
+    """,
+    'SDG totals': """
+        SELECT sdg_id, count(*), sum(hours), sum(donation_amount), sum(impact_points), sum(carbon_offset_estimate)
+        FROM csr_activity
+        WHERE status = 'approved'
+        GROUP BY sdg_id
+    """,
+    'employee profile totals': """
+        SELECT employee_profile_id, count(*), sum(hours), sum(donation_amount), sum(impact_points), sum(carbon_offset_estimate)
+        FROM csr_activity
+        WHERE status = 'approved' AND employee_profile_id = %(profile_id)s
+        GROUP BY employee_profile_id
+    """,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--dsn', required=True, help="libpq connection string of the database")
+    parser.add_argument('--rows', type=int, default=1000000, help="Activities to seed")
+    parser.add_argument('--cleanup', action='store_true', help="Delete the seeded activities at the end")
+    return parser.parse_args()
+
+
+def seed(cr, rows):
+    cr.execute("""
+        INSERT INTO csr_activity (
+            name, employee_profile_id, employee_id, department_id, date, hours, donation_amount,
+            status, sdg_category, sdg_id, carbon_offset_estimate, impact_points
+        )
+        SELECT %(prefix)s || ' ' || g.n, p.id, p.employee_id, p.department_id,
+               (now() - (random() * 1095) * interval '1 day')::date,
+               g.hours, round((random() * 100)::numeric, 2),
+               (ARRAY['approved', 'approved', 'approved', 'approved', 'approved', 'approved', 'approved', 'rejected', 'submitted', 'draft'])[1 + (g.n %% 10)],
+               s.key, s.id, g.hours * 5, (g.hours * 10)::int
+        FROM (SELECT n, (1 + floor(random() * 8))::float8 AS hours FROM generate_series(1, %(rows)s) AS n) g
+        JOIN LATERAL (
+            SELECT id, employee_id, department_id FROM csr_employee_profile
+            ORDER BY id OFFSET (g.n %% (SELECT count(*) FROM csr_employee_profile)) LIMIT 1
+        ) p ON true
+        JOIN LATERAL (
+            SELECT id, key FROM csr_sdg ORDER BY id OFFSET (g.n %% (SELECT count(*) FROM csr_sdg)) LIMIT 1
+        ) s ON true
+    """, {'prefix': SEED_NAME_PREFIX, 'rows': rows})
+
+
+def main():
+    args = parse_args()
+    cnx = psycopg2.connect(args.dsn)
+    cnx.autocommit = True
+    cr = cnx.cursor()
+
+    cr.execute("SELECT count(*) FROM csr_employee_profile")
+    if not cr.fetchone()[0]:
+        raise SystemExit("No csr.employee.profile in the database: load the demo data first.")
+
+    start = time.monotonic()
+    seed(cr, args.rows)
+    print(f"Seeded {args.rows} activities in {time.monotonic() - start:.1f} s")
+    cr.execute("VACUUM ANALYZE csr_activity")
+
+    cr.execute("SELECT array_agg(DISTINCT department_id) FROM csr_employee_profile WHERE department_id IS NOT NULL")
+    department_ids = cr.fetchone()[0] or []
+    cr.execute("SELECT min(id) FROM csr_employee_profile")
+    params = {'department_ids': department_ids, 'profile_id': cr.fetchone()[0]}
+
+    for title, query in AGGREGATE_QUERIES.items():
+        cr.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+        print(f"\n=== {title} ===")
+        print("\n".join(row[0] for row in cr.fetchall()))
+
+    if args.cleanup:
+        cr.execute("DELETE FROM csr_activity WHERE name LIKE %s", (SEED_NAME_PREFIX + ' %',))
+        print(f"\nDeleted {cr.rowcount} seeded activities")
+    cnx.close()
+
+
+if __name__ == '__main__':
+    main()